@@ -7,6 +7,7 @@ Orchestrates the Research → Write → Review stages for high-quality TSG gener
 
 from __future__ import annotations
 
+import atexit
 import os
 import queue
 import sys
@@ -14,6 +15,7 @@ import time
 import threading
 import httpx
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -140,14 +142,20 @@ def _get_verbose_logger() -> logging.Logger | None:
     console_handler.setLevel(logging.DEBUG)
     console_format = logging.Formatter("[VERBOSE] %(message)s")
     console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
     
     # File handler
     file_handler = logging.FileHandler(log_file, encoding="utf-8")
     file_handler.setLevel(logging.DEBUG)
     file_format = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", datefmt="%H:%M:%S")
     file_handler.setFormatter(file_format)
-    logger.addHandler(file_handler)
+    
+    # Handlers run on a listener thread so console/file I/O doesn't stall the
+    # stream-reading loop (and inflate the wait times it logs)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Flush pending records on exit
+    logger.addHandler(QueueHandler(log_queue))
     
     # Log startup info
     logger.info(f"Pipeline verbose logging started - {datetime.now().isoformat()}")
@@ -789,12 +797,36 @@ def _iterate_with_timeout(stream, timeout: float, stage: str):
                 return
 
 
+# Stage-specific icons for SSE status messages
+_STAGE_ICONS = {
+    "research": "🔍",
+    "write": "✏️",
+    "review": "🔎",
+}
+
+
+# Output item types that represent a tool call (timed for tool-timeout detection).
+# web_search_call is the WebSearchPreviewTool type; bing_grounding_call is legacy.
+_WEB_SEARCH_ITEM_TYPES = frozenset({"web_search_call", "bing_grounding_call"})
+_TOOL_ITEM_TYPES = frozenset({"mcp_call", "function_call"}) | _WEB_SEARCH_ITEM_TYPES
+
+
+def _tool_display_name(item_type: str, item: Any) -> str:
+    """Return the user-facing name for a tool call output item."""
+    if item_type == "mcp_call":
+        return getattr(item, 'name', None) or "Microsoft Learn"
+    if item_type in _WEB_SEARCH_ITEM_TYPES:
+        return "Web Search"
+    return getattr(item, 'name', None) or "function"
+
+
 def process_pipeline_v2_stream(
     event,
     event_queue: queue.Queue | None,
     stage: PipelineStage,
     response_text_parts: list[str],
     timing_context: dict | None = None,
+    verbose: bool | None = None,
 ) -> None:
     """Process a v2 streaming event for pipeline stages.
     
@@ -804,11 +836,15 @@ def process_pipeline_v2_stream(
         stage: Current pipeline stage
         response_text_parts: List to accumulate response text
         timing_context: Optional dict to track timing (keys: 'tool_start', 'stage_start')
+            and the running output length ('output_chars')
+        verbose: Whether to log every event; callers in a stream loop pass the
+            flag they already read. None reads PIPELINE_VERBOSE from the environment.
     
     Set PIPELINE_VERBOSE=1 environment variable to log all events for debugging.
     """
     # Verbose logging for debugging hangs
-    verbose = os.getenv("PIPELINE_VERBOSE", "").lower() in ("1", "true", "yes")
+    if verbose is None:
+        verbose = os.getenv("PIPELINE_VERBOSE", "").lower() in ("1", "true", "yes")
     
     event_type = getattr(event, 'type', None)
     stage_name = stage.value.capitalize()
@@ -817,25 +853,37 @@ def process_pipeline_v2_stream(
     if verbose:
         elapsed = 0.0
         if timing_context and 'stage_start' in timing_context:
-            elapsed = time.time() - timing_context['stage_start']
+            elapsed = time.monotonic() - timing_context['stage_start']
         verbose_log(f"[{stage_name}][{elapsed:6.1f}s] {event_type}")
     
-    # Stage-specific icons
-    stage_icons = {
-        "research": "🔍",
-        "write": "✏️",
-        "review": "🔎",
-    }
-    stage_icon = stage_icons.get(stage.value, "•")
+    stage_icon = _STAGE_ICONS.get(stage.value, "•")
     
     def send_event(event_type: str, data: dict):
         if event_queue:
             data["stage"] = stage.value
             event_queue.put({"type": event_type, "data": data})
     
-    if event_type == "response.created":
+    # Text deltas are by far the most frequent event, so test for them first
+    if event_type == "response.output_text.delta":
+        delta = getattr(event, 'delta', '')
+        if delta:
+            response_text_parts.append(delta)
+            # Keep a running length so each delta doesn't re-sum every prior part
+            if timing_context is not None:
+                total_len = timing_context.get('output_chars', 0) + len(delta)
+                timing_context['output_chars'] = total_len
+            else:
+                total_len = sum(len(p) for p in response_text_parts)
+            # Send periodic progress for long outputs (every ~500 chars)
+            if total_len % 500 < len(delta):
+                send_event("progress", {
+                    "message": f"{stage_icon} {stage_name}: Writing response... ({total_len:,} chars)",
+                    "chars": total_len,
+                })
+    
+    elif event_type == "response.created":
         if timing_context is not None:
-            timing_context['stage_start'] = time.time()
+            timing_context['stage_start'] = time.monotonic()
         send_event("status", {
             "status": "in_progress",
             "message": f"{stage_icon} {stage_name}: Processing...",
@@ -847,7 +895,7 @@ def process_pipeline_v2_stream(
         elapsed = ""
         if timing_context and 'tool_end' in timing_context:
             # Time since last tool completed (model thinking time)
-            thinking_time = time.time() - timing_context['tool_end']
+            thinking_time = time.monotonic() - timing_context['tool_end']
             if thinking_time > 2:
                 elapsed = f" ({thinking_time:.0f}s model processing)"
         send_event("status", {
@@ -856,18 +904,6 @@ def process_pipeline_v2_stream(
             "icon": stage_icon,
         })
     
-    elif event_type == "response.output_text.delta":
-        delta = getattr(event, 'delta', '')
-        if delta:
-            response_text_parts.append(delta)
-            # Send periodic progress for long outputs (every ~500 chars)
-            total_len = sum(len(p) for p in response_text_parts)
-            if total_len % 500 < len(delta):
-                send_event("progress", {
-                    "message": f"{stage_icon} {stage_name}: Writing response... ({total_len:,} chars)",
-                    "chars": total_len,
-                })
-    
     elif event_type == "response.output_item.added":
         item = getattr(event, 'item', None)
         if item and hasattr(item, 'type'):
@@ -877,28 +913,22 @@ def process_pipeline_v2_stream(
             if verbose:
                 verbose_log(f"[{stage_name}] output_item.added: type={item_type}, item={item}")
             
+            tool_name = _tool_display_name(item_type, item) if item_type in _TOOL_ITEM_TYPES else None
+            
             # Track tool start time and name (web_search_call is the new event type, bing_grounding_call is legacy)
-            if timing_context is not None and item_type in ('mcp_call', 'web_search_call', 'bing_grounding_call', 'function_call'):
-                timing_context['tool_start'] = time.time()
-                # Store tool name for timeout error messages
-                if item_type == 'mcp_call':
-                    timing_context['tool_name'] = getattr(item, 'name', None) or 'Microsoft Learn'
-                elif item_type in ('web_search_call', 'bing_grounding_call'):
-                    timing_context['tool_name'] = 'Web Search'
-                else:
-                    timing_context['tool_name'] = getattr(item, 'name', 'tool')
+            if timing_context is not None and tool_name is not None:
+                timing_context['tool_start'] = time.monotonic()
+                timing_context['tool_name'] = tool_name  # For timeout error messages
             
             if item_type == "mcp_call":
-                # Try to get the MCP tool name from the item
-                mcp_name = getattr(item, 'name', None) or "Microsoft Learn"
                 send_event("tool", {
                     "type": "mcp",
                     "icon": "📚",
-                    "name": mcp_name,
-                    "message": f"📚 Calling {mcp_name}...",
+                    "name": tool_name,
+                    "message": f"📚 Calling {tool_name}...",
                     "status": "running"
                 })
-            elif item_type in ("web_search_call", "bing_grounding_call"):
+            elif item_type in _WEB_SEARCH_ITEM_TYPES:
                 # web_search_call is the event type from WebSearchPreviewTool
                 # bing_grounding_call is the legacy event type from BingGroundingAgentTool
                 # Try to get the search query
@@ -913,12 +943,11 @@ def process_pipeline_v2_stream(
                     "status": "running"
                 })
             elif item_type == "function_call":
-                func_name = getattr(item, 'name', 'function')
                 send_event("tool", {
                     "type": "function",
                     "icon": "⚙️",
-                    "name": func_name,
-                    "message": f"⚙️ Calling {func_name}...",
+                    "name": tool_name,
+                    "message": f"⚙️ Calling {tool_name}...",
                     "status": "running"
                 })
             elif item_type == "message":
@@ -944,15 +973,16 @@ def process_pipeline_v2_stream(
             # Calculate tool elapsed time and clear tool tracking
             tool_elapsed = ""
             if timing_context and 'tool_start' in timing_context:
-                elapsed_sec = time.time() - timing_context['tool_start']
+                tool_end = time.monotonic()
+                elapsed_sec = tool_end - timing_context['tool_start']
                 tool_elapsed = f" ({elapsed_sec:.1f}s)"
-                timing_context['tool_end'] = time.time()  # Track when tool finished for model thinking time
+                timing_context['tool_end'] = tool_end  # Track when tool finished for model thinking time
                 # Clear tool tracking for next tool call
                 timing_context.pop('tool_start', None)
                 timing_context.pop('tool_name', None)
             
             if item_type == "mcp_call":
-                mcp_name = getattr(item, 'name', None) or "Microsoft Learn"
+                mcp_name = _tool_display_name(item_type, item)
                 send_event("tool", {
                     "type": "mcp",
                     "icon": "✅",
@@ -966,7 +996,7 @@ def process_pipeline_v2_stream(
                     "message": f"{stage_icon} {stage_name}: Processing search results...",
                     "icon": stage_icon,
                 })
-            elif item_type in ("web_search_call", "bing_grounding_call"):
+            elif item_type in _WEB_SEARCH_ITEM_TYPES:
                 send_event("tool", {
                     "type": "web_search",
                     "icon": "✅",
@@ -980,7 +1010,7 @@ def process_pipeline_v2_stream(
                     "icon": stage_icon,
                 })
             elif item_type == "function_call":
-                func_name = getattr(item, 'name', 'function')
+                func_name = _tool_display_name(item_type, item)
                 send_event("tool", {
                     "type": "function",
                     "icon": "✅",
@@ -1007,6 +1037,8 @@ def process_pipeline_v2_stream(
             if event.response.output_text:
                 response_text_parts.clear()
                 response_text_parts.append(event.response.output_text)
+                if timing_context is not None:
+                    timing_context['output_chars'] = len(event.response.output_text)
         
         # Accumulate token usage from response.usage (may be None)
         # Agents with tool calls can produce multiple response.completed events
@@ -1128,6 +1160,33 @@ def process_pipeline_v2_stream(
         _send_classified_error(send_event, stage_name, str(event))
 
 
+# =============================================================================
+# AZURE CREDENTIAL
+# =============================================================================
+# DefaultAzureCredential walks its chain (env, managed identity, az CLI, ...)
+# and caches tokens per instance. Share one instance across pipeline runs and
+# web endpoints; expire it so a fresh `az login` is picked up.
+
+CREDENTIAL_TTL_SECONDS = 300
+_credential: tuple[float, "DefaultAzureCredential"] | None = None
+_credential_lock = threading.Lock()
+
+
+def get_credential() -> "DefaultAzureCredential":
+    """Return a process-wide DefaultAzureCredential (TTL-cached)."""
+    global _credential
+    from azure.identity import DefaultAzureCredential
+    with _credential_lock:
+        now = time.monotonic()
+        if _credential is None or now - _credential[0] > CREDENTIAL_TTL_SECONDS:
+            expired = _credential
+            _credential = (now, DefaultAzureCredential())
+            # Release the expired instance's HTTP transports instead of leaking them
+            if expired is not None:
+                expired[1].close()
+        return _credential[1]
+
+
 class TSGPipeline:
     """
     Multi-stage TSG generation pipeline.
@@ -1190,12 +1249,11 @@ class TSGPipeline:
             self._event_queue.put({"type": event_type, "data": data})
     
     def _get_project_client(self) -> "AIProjectClient":
-        """Create a project client."""
-        from azure.identity import DefaultAzureCredential
+        """Create a project client (with the shared credential)."""
         from azure.ai.projects import AIProjectClient
         return AIProjectClient(
             endpoint=self.project_endpoint,
-            credential=DefaultAzureCredential()
+            credential=get_credential()
         )
     
     def _run_stage(
@@ -1252,14 +1310,14 @@ class TSGPipeline:
             stream_response = openai_client.responses.create(**stream_kwargs)
             
             event_count = 0
-            last_event_time = time.time()
+            last_event_time = time.monotonic()
             last_event_type = None
             
             # Wrap stream with per-event timeout to detect hung connections
             # This ensures we don't wait forever if the stream stops sending events
             for event in _iterate_with_timeout(stream_response, STREAM_IDLE_TIMEOUT, stage.value):
                 event_count += 1
-                now = time.time()
+                now = time.monotonic()
                 wait_time = now - last_event_time
                 event_type = getattr(event, 'type', None)
                 
@@ -1286,6 +1344,7 @@ class TSGPipeline:
                     stage, 
                     response_text_parts,
                     timing_context,
+                    verbose,
                 )
                 
                 # Capture conversation ID or response ID for session persistence
@@ -1443,7 +1502,7 @@ class TSGPipeline:
         result = PipelineResult(success=False, thread_id=conversation_id or "")
         result.notes_line_count = len(notes.splitlines()) if notes else 0
         result.image_count = len(images) if images else 0
-        pipeline_start = time.time()
+        pipeline_start = time.monotonic()
         project = self._get_project_client()
         
         # Debug: log when pipeline run starts
@@ -1495,7 +1554,7 @@ class TSGPipeline:
                     research_report = ""
                     if not user_answers:
                         # Only do research on initial generation, not follow-ups
-                        research_stage_start = time.time()
+                        research_stage_start = time.monotonic()
                         research_prompt = build_research_prompt(notes)
                         
                         # Use unified retry logic
@@ -1512,7 +1571,7 @@ class TSGPipeline:
                             research_report = research_response
                         
                         result.research_report = research_report
-                        result.research_duration_s = time.time() - research_stage_start
+                        result.research_duration_s = time.monotonic() - research_stage_start
                         result.research_input_tokens = research_tc.get('input_tokens', 0)
                         result.research_output_tokens = research_tc.get('output_tokens', 0)
                         result.stages_completed.append(PipelineStage.RESEARCH)
@@ -1543,7 +1602,7 @@ class TSGPipeline:
                     
                     # --- Stage 2: Write ---
                     self._check_cancelled()  # Check before write stage
-                    write_stage_start = time.time()
+                    write_stage_start = time.monotonic()
                     self._send_stage_event(PipelineStage.WRITE, "stage_start", {
                         "message": "✏️ Write: Drafting TSG from notes and research...",
                         "icon": "✏️",
@@ -1566,7 +1625,7 @@ class TSGPipeline:
                         writer_prompt,
                     )
                     result.thread_id = write_conv_id  # Store conversation ID
-                    result.write_duration_s = time.time() - write_stage_start
+                    result.write_duration_s = time.monotonic() - write_stage_start
                     result.write_input_tokens = write_tc.get('input_tokens', 0)
                     result.write_output_tokens = write_tc.get('output_tokens', 0)
                     result.stages_completed.append(PipelineStage.WRITE)
@@ -1585,7 +1644,7 @@ class TSGPipeline:
                     
                     # --- Stage 3: Review (with retry loop) ---
                     self._check_cancelled()  # Check before review stage
-                    review_stage_start = time.time()
+                    review_stage_start = time.monotonic()
                     
                     # Optimization: skip full review for pure MISSING-fill iterations.
                     # If the prior review was clean (no accuracy_issues or suggestions) and
@@ -1607,6 +1666,7 @@ class TSGPipeline:
                         if not has_review_feedback and prior_review.get("approved", False):
                             skip_review = True
                     
+                    validation = None
                     if skip_review:
                         # Reuse prior review result (clean pass) — just validate structure
                         validation = validate_tsg_output(draft_tsg)
@@ -1634,7 +1694,9 @@ class TSGPipeline:
                         self._check_cancelled()  # Check before each review retry
                         result.retry_count = retry
                         
-                        validation = validate_tsg_output(draft_tsg)
+                        # A skip-review fallthrough has already validated this exact draft
+                        if validation is None or retry > 0:
+                            validation = validate_tsg_output(draft_tsg)
                         
                         if validation["valid"]:
                             review_prompt = build_review_prompt(
@@ -1738,7 +1800,7 @@ Please fix these issues and regenerate the TSG with correct format.
                                 final_tsg = draft_tsg
                                 break
                     
-                    result.review_duration_s = time.time() - review_stage_start
+                    result.review_duration_s = time.monotonic() - review_stage_start
                     result.stages_completed.append(PipelineStage.REVIEW)
                     
                     # Test mode: capture review output
@@ -1802,7 +1864,7 @@ Please fix these issues and regenerate the TSG with correct format.
             })
         
         # Finalize telemetry fields
-        result.duration_seconds = time.time() - pipeline_start
+        result.duration_seconds = time.monotonic() - pipeline_start
         result.total_tokens = (
             result.research_input_tokens + result.research_output_tokens
             + result.write_input_tokens + result.write_output_tokens
@@ -1811,6 +1873,10 @@ Please fix these issues and regenerate the TSG with correct format.
         return result
 
 
+# .env is parsed once per process; web_app reloads it with override=True on config save
+_dotenv_loaded = False
+
+
 def run_pipeline(
     notes: str,
     images: list[dict] | None = None,
@@ -1832,8 +1898,11 @@ def run_pipeline(
     """
     import json
     from datetime import datetime
-    from dotenv import load_dotenv
-    load_dotenv()
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
     
     endpoint = os.getenv("PROJECT_ENDPOINT")
     if not endpoint:
@@ -1904,7 +1973,8 @@ def run_pipeline(
         logs_dir.mkdir(exist_ok=True)
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        test_output_file = logs_dir / f"test_output_{timestamp}.json"
+        # Short ns-derived suffix so runs finishing in the same second don't overwrite each other
+        test_output_file = logs_dir / f"test_output_{timestamp}_{time.time_ns() & 0xFFFFFF:06x}.json"
         test_data = {
             "timestamp": timestamp,
             "success": result.success,
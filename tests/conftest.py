@@ -130,17 +130,42 @@ def stream_idle_error():
     )
 
 
+@pytest.fixture(autouse=True)
+def _no_rate_limit_backoff(monkeypatch):
+    """Zero the pipeline's rate-limit backoff so retry tests never really sleep."""
+    monkeypatch.setattr("pipeline.TSGPipeline.RATE_LIMIT_BACKOFF_BASE", 0)
+
+
+@pytest.fixture(autouse=True)
+def _reset_credential_cache(monkeypatch):
+    """Start each test without a cached Azure credential (see pipeline.get_credential)."""
+    monkeypatch.setattr("pipeline._credential", None)
+
+
 # =============================================================================
 # FIXTURES: Flask Test Client
 # =============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the Flask app."""
+    """Create a test client for the Flask app (shared across the test session).
+
+    The client is not entered as a context manager: the endpoints under test
+    don't rely on a preserved request context, so there is nothing to push or
+    pop between requests.
+    """
     from web_app import app
     app.config['TESTING'] = True
-    with app.test_client() as client:
-        yield client
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def _clear_sessions():
+    """Drop in-memory web sessions after each test so state doesn't leak."""
+    yield
+    web_app = sys.modules.get("web_app")
+    if web_app is not None:
+        web_app.sessions.clear()
 
 
 # =============================================================================
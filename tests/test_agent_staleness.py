@@ -2,20 +2,23 @@
 test_agent_staleness.py — Tests for agent staleness detection.
 
 Tests that:
-- save_agent_ids() persists app_version in .agent_ids.json
+- save_agent_ids() persists app_version in .agent_ids.json (swapped in atomically, mode kept)
 - /api/status reports agents_stale when version mismatches
 - /api/validate reports agents_stale and surfaces a warning
 - Pre-existing files without app_version are treated as stale
+- get_agent_ids() caches the parsed file until it changes
 
 Run with: pytest tests/test_agent_staleness.py -v
 """
 
 import json
+import stat
+import sys
 import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
-from web_app import app, save_agent_ids, get_agent_ids
+from web_app import app, save_agent_ids, get_agent_ids, _read_agent_ids
 from version import APP_VERSION
 
 
@@ -78,6 +81,70 @@ class TestSaveAgentIdsVersion:
         assert data["name_prefix"] == "MyPrefix"
         assert data["app_version"] == APP_VERSION
 
+    @pytest.mark.unit
+    def test_save_replaces_file_without_leaving_temp(self, tmp_agent_ids, sample_agents):
+        """Saving over an existing file swaps it in place and cleans up the temp file."""
+        tmp_agent_ids.write_text("{}", encoding="utf-8")
+        save_agent_ids(
+            researcher=sample_agents["researcher"],
+            writer=sample_agents["writer"],
+            reviewer=sample_agents["reviewer"],
+            name_prefix="TSG-Builder",
+        )
+
+        assert json.loads(tmp_agent_ids.read_text(encoding="utf-8"))["name_prefix"] == "TSG-Builder"
+        assert [p.name for p in tmp_agent_ids.parent.iterdir()] == [".agent_ids.json"]
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX file modes")
+    @pytest.mark.parametrize("existing_mode, expected_mode", [
+        (None, 0o644),
+        (0o640, 0o640),
+    ], ids=["new-file", "existing-file"])
+    def test_save_keeps_file_mode(self, tmp_agent_ids, sample_agents, existing_mode, expected_mode):
+        """The swapped-in file keeps the old file's mode instead of the temp file's 0600."""
+        if existing_mode is not None:
+            tmp_agent_ids.write_text("{}", encoding="utf-8")
+            tmp_agent_ids.chmod(existing_mode)
+        save_agent_ids(
+            researcher=sample_agents["researcher"],
+            writer=sample_agents["writer"],
+            reviewer=sample_agents["reviewer"],
+            name_prefix="TSG-Builder",
+        )
+
+        assert stat.S_IMODE(tmp_agent_ids.stat().st_mode) == expected_mode
+
+
+# =============================================================================
+# TESTS: get_agent_ids() caching
+# =============================================================================
+
+class TestGetAgentIdsCache:
+    """get_agent_ids parses the file once per change, not once per call."""
+
+    @pytest.mark.unit
+    def test_repeated_reads_hit_cache(self, tmp_agent_ids, sample_agents):
+        """Unchanged file should be parsed only once."""
+        tmp_agent_ids.write_text(json.dumps({**sample_agents, "name_prefix": "A"}), encoding="utf-8")
+        _read_agent_ids.cache_clear()
+
+        first = get_agent_ids()
+        second = get_agent_ids()
+
+        assert first == second
+        assert first is not second  # callers get their own top-level dict
+        assert _read_agent_ids.cache_info().misses == 1
+
+    @pytest.mark.unit
+    def test_save_invalidates_cache(self, tmp_agent_ids, sample_agents):
+        """save_agent_ids should be visible to the next get_agent_ids call."""
+        save_agent_ids(**sample_agents, name_prefix="Old")
+        assert get_agent_ids()["name_prefix"] == "Old"
+
+        save_agent_ids(**sample_agents, name_prefix="New")
+        assert get_agent_ids()["name_prefix"] == "New"
+
 
 # =============================================================================
 # TESTS: /api/status staleness
@@ -97,7 +164,7 @@ class TestStatusStaleness:
         tmp_agent_ids.write_text(json.dumps(data), encoding="utf-8")
 
         response = client.get("/api/status")
-        result = json.loads(response.data)
+        result = response.get_json()
 
         assert result["agents"]["configured"] is True
         assert result["agents"]["agents_stale"] is False
@@ -113,7 +180,7 @@ class TestStatusStaleness:
         tmp_agent_ids.write_text(json.dumps(data), encoding="utf-8")
 
         response = client.get("/api/status")
-        result = json.loads(response.data)
+        result = response.get_json()
 
         assert result["agents"]["configured"] is True
         assert result["agents"]["agents_stale"] is True
@@ -130,7 +197,7 @@ class TestStatusStaleness:
         tmp_agent_ids.write_text(json.dumps(data), encoding="utf-8")
 
         response = client.get("/api/status")
-        result = json.loads(response.data)
+        result = response.get_json()
 
         assert result["agents"]["configured"] is True
         assert result["agents"]["agents_stale"] is True
@@ -141,7 +208,7 @@ class TestStatusStaleness:
         """When agents are not configured, staleness fields should not appear."""
         # No .agent_ids.json exists
         response = client.get("/api/status")
-        result = json.loads(response.data)
+        result = response.get_json()
 
         assert result["agents"]["configured"] is False
         # staleness fields should not be set
@@ -198,7 +265,7 @@ class TestValidateStaleness:
         tmp_agent_ids.write_text(json.dumps(data), encoding="utf-8")
 
         response = client.get("/api/validate")
-        result = json.loads(response.data)
+        result = response.get_json()
 
         assert result["agents_stale"] is False
         assert result["agents_created_version"] is None
@@ -219,7 +286,7 @@ class TestValidateStaleness:
         tmp_agent_ids.write_text(json.dumps(data), encoding="utf-8")
 
         response = client.get("/api/validate")
-        result = json.loads(response.data)
+        result = response.get_json()
 
         assert result["agents_stale"] is True
         assert result["agents_created_version"] == "1.0.5"
@@ -241,7 +308,7 @@ class TestValidateStaleness:
         tmp_agent_ids.write_text(json.dumps(data), encoding="utf-8")
 
         response = client.get("/api/validate")
-        result = json.loads(response.data)
+        result = response.get_json()
 
         assert result["agents_stale"] is True
         assert result["agents_created_version"] == "unknown"
@@ -255,7 +322,7 @@ class TestValidateStaleness:
         """When no agents configured, staleness should be false/None."""
         # No .agent_ids.json file
         response = client.get("/api/validate")
-        result = json.loads(response.data)
+        result = response.get_json()
 
         assert result["agents_stale"] is False
         assert result["agents_created_version"] is None
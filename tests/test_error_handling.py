@@ -5,14 +5,18 @@ Tests the Phase 4 error handling enhancements:
 - PipelineError exception class
 - _get_user_friendly_error() function
 - classify_error() with various error types
+- Rate-limit retry in TSGPipeline._run_stage_with_retry
 
 Run with: pytest tests/test_error_handling.py -v
 """
 
+import time
+
 import pytest
 from pipeline import (
     PipelineError,
     PipelineStage,
+    TSGPipeline,
     classify_error,
     ResponseFailedError,
 )
@@ -353,6 +357,33 @@ class TestResponseFailedError:
         )
 
 
+# =============================================================================
+# TESTS: Stage Retry on Rate Limits
+# =============================================================================
+
+class TestRateLimitRetry:
+    """Tests for _run_stage_with_retry backoff on 429s."""
+    
+    @pytest.mark.unit
+    def test_rate_limited_stage_is_retried(self, response_failed_error_factory, mocker):
+        """A 429 should be retried (after the backoff wait) and the retry's result returned."""
+        pipeline = TSGPipeline("https://test.azure.com", "r", "w", "v")
+        rate_limited = response_failed_error_factory(
+            stage="write", error_msg="Rate limited", http_status_code=429,
+        )
+        mocker.patch.object(
+            pipeline, "_run_stage", side_effect=[rate_limited, ("ok", "conv_1", {})],
+        )
+        mocker.patch("pipeline.log_error")  # keep logs/errors.log out of the test run
+        sleep = mocker.spy(time, "sleep")
+        
+        result = pipeline._run_stage_with_retry(None, None, "agent", PipelineStage.WRITE, "prompt")
+        
+        assert result == ("ok", "conv_1", {})
+        assert pipeline._run_stage.call_count == 2
+        sleep.assert_called_once_with(0)  # backoff zeroed by conftest
+
+
 # =============================================================================
 # STANDALONE RUNNER (for running without pytest)
 # =============================================================================
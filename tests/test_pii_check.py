@@ -703,7 +703,7 @@ class TestPiiCheckEndpoint:
                            content_type="application/json")
 
         assert resp.status_code == 200
-        data = json.loads(resp.data)
+        data = resp.get_json()
         assert data["pii_detected"] is False
         assert data["findings"] == []
 
@@ -725,7 +725,7 @@ class TestPiiCheckEndpoint:
                            content_type="application/json")
 
         assert resp.status_code == 200
-        data = json.loads(resp.data)
+        data = resp.get_json()
         assert data["pii_detected"] is True
         assert len(data["findings"]) == 1
         assert data["findings"][0]["category"] == "Email"
@@ -737,7 +737,7 @@ class TestPiiCheckEndpoint:
                            data=json.dumps({"notes": ""}),
                            content_type="application/json")
         assert resp.status_code == 400
-        data = json.loads(resp.data)
+        data = resp.get_json()
         assert "error" in data
 
     @pytest.mark.unit
@@ -765,7 +765,7 @@ class TestPiiCheckEndpoint:
                            content_type="application/json")
 
         assert resp.status_code == 500
-        data = json.loads(resp.data)
+        data = resp.get_json()
         assert "error" in data
         assert "hint" in data
 
@@ -795,7 +795,7 @@ class TestGenerateStreamPiiGate:
                            content_type="application/json")
 
         assert resp.status_code == 400
-        data = json.loads(resp.data)
+        data = resp.get_json()
         assert "PII detected" in data["error"]
         assert len(data["findings"]) == 1
 
@@ -816,7 +816,7 @@ class TestGenerateStreamPiiGate:
                            content_type="application/json")
 
         assert resp.status_code == 500
-        data = json.loads(resp.data)
+        data = resp.get_json()
         assert "error" in data
         assert "hint" in data
 
@@ -849,13 +849,10 @@ class TestAnswerStreamPiiGate:
                            content_type="application/json")
 
         assert resp.status_code == 400
-        data = json.loads(resp.data)
+        data = resp.get_json()
         assert "PII detected" in data["error"]
         assert len(data["findings"]) == 1
 
-        # Cleanup
-        sessions.pop("test-thread-00000000-0000-0000-0000-000000000000", None)
-
     @pytest.mark.unit
     @patch("web_app.check_for_pii")
     def test_pii_check_error_returns_500(self, mock_check, client):
@@ -879,9 +876,6 @@ class TestAnswerStreamPiiGate:
                            content_type="application/json")
 
         assert resp.status_code == 500
-        data = json.loads(resp.data)
+        data = resp.get_json()
         assert "error" in data
         assert "hint" in data
-
-        # Cleanup
-        sessions.pop("test-thread-00000000-0000-0000-0000-000000000000", None)
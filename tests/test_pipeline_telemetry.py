@@ -5,13 +5,18 @@ Tests cover:
 - PipelineResult includes new telemetry fields with sensible defaults
 - Token accumulation sums across multiple response.completed events
 - Duration fields and input metadata are populated
+- Running output length is tracked across text deltas
+- Tool start events resolve one display name for the UI and timeout tracking
 """
 
 import queue
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
+import pytest
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -208,6 +213,82 @@ class TestTokenAccumulation:
         assert timing_context['output_tokens'] == 0
 
 
+# =============================================================================
+# OUTPUT LENGTH TRACKING
+# =============================================================================
+
+class TestOutputCharTracking:
+    """Text deltas keep a running output length instead of re-summing parts."""
+
+    def _make_delta_event(self, delta):
+        event = MagicMock()
+        event.type = "response.output_text.delta"
+        event.delta = delta
+        return event
+
+    def test_running_length_matches_parts(self):
+        """output_chars tracks the total length of accumulated deltas."""
+        timing_context = {}
+        parts = []
+        for delta in ["a" * 300, "b" * 300, "c" * 10]:
+            process_pipeline_v2_stream(
+                self._make_delta_event(delta), None, PipelineStage.WRITE, parts, timing_context
+            )
+        assert timing_context['output_chars'] == sum(len(p) for p in parts) == 610
+
+    def test_progress_event_reports_running_length(self):
+        """Progress events crossing a 500-char boundary report the running total."""
+        event_queue = queue.Queue()
+        timing_context = {}
+        parts = []
+        for delta in ["a" * 300, "b" * 300]:
+            process_pipeline_v2_stream(
+                self._make_delta_event(delta), event_queue, PipelineStage.WRITE, parts, timing_context
+            )
+        progress = event_queue.get_nowait()
+        assert progress["type"] == "progress"
+        assert progress["data"]["chars"] == 600
+
+    def test_response_completed_resets_length(self):
+        """Final output_text replaces the parts, so the length follows it."""
+        timing_context = {}
+        parts = []
+        process_pipeline_v2_stream(
+            self._make_delta_event("x" * 50), None, PipelineStage.WRITE, parts, timing_context
+        )
+        completed = MagicMock()
+        completed.type = "response.completed"
+        completed.response.output_text = "test output"
+        process_pipeline_v2_stream(completed, None, PipelineStage.WRITE, parts, timing_context)
+        assert timing_context['output_chars'] == len("test output")
+
+
+class TestToolEventNames:
+    """Tool start events share one name for the UI event and timeout tracking."""
+
+    @pytest.mark.parametrize("item, expected", [
+        (SimpleNamespace(type="mcp_call", name="microsoft_docs_search"), "microsoft_docs_search"),
+        (SimpleNamespace(type="mcp_call", name=None), "Microsoft Learn"),
+        (SimpleNamespace(type="web_search_call"), "Web Search"),
+        (SimpleNamespace(type="bing_grounding_call"), "Web Search"),
+        (SimpleNamespace(type="function_call", name="lookup"), "lookup"),
+        # Unnamed function calls are "function" everywhere (timeout tracking used to say "tool")
+        (SimpleNamespace(type="function_call"), "function"),
+        (SimpleNamespace(type="function_call", name=None), "function"),
+    ], ids=[
+        "mcp-named", "mcp-default", "web-search", "bing-legacy",
+        "function-named", "function-no-name", "function-name-none",
+    ])
+    def test_tool_name(self, item, expected):
+        """The tool event and timing_context['tool_name'] carry the same resolved name."""
+        event_queue = queue.Queue()
+        timing_context = {}
+        event = SimpleNamespace(type="response.output_item.added", item=item)
+        process_pipeline_v2_stream(event, event_queue, PipelineStage.RESEARCH, [], timing_context)
+        assert timing_context['tool_name'] == expected
+        assert event_queue.get_nowait()["data"]["name"] == expected
+
+
 # =============================================================================
 # INPUT METADATA
 # =============================================================================
@@ -18,10 +18,11 @@ Tests cover:
 - follow_up_round tracking in sessions
 """
 
-import json
 import sys
 import threading
+from collections import deque
 from pathlib import Path
+from types import MappingProxyType
 from unittest.mock import patch, MagicMock
 
 import pytest
@@ -29,6 +30,79 @@ import pytest
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from pipeline import PipelineResult, PipelineStage
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+_ALL_STAGES = (PipelineStage.RESEARCH, PipelineStage.WRITE, PipelineStage.REVIEW)
+
+# Baseline successful result (read-only); tests override only the fields they care about
+_BASE_RESULT = MappingProxyType({
+    "success": True,
+    "tsg_content": "# Test TSG",
+    "questions_content": "NO_MISSING",
+    "research_report": "Research report",
+    "thread_id": "conv_123",
+    "duration_seconds": 42.5,
+    "research_duration_s": 10.0,
+    "write_duration_s": 20.0,
+    "review_duration_s": 12.5,
+    "research_input_tokens": 1000,
+    "research_output_tokens": 500,
+    "write_input_tokens": 800,
+    "write_output_tokens": 400,
+    "review_input_tokens": 600,
+    "review_output_tokens": 300,
+    "total_tokens": 3600,
+    "notes_line_count": 25,
+    "image_count": 2,
+})
+
+
+# Canned check_for_pii() results, built fresh per call so no test can leak state into another
+def _pii_result_email() -> dict:
+    """check_for_pii() result with a single email finding."""
+    return {
+        "pii_detected": True,
+        "findings": [
+            {"text": "test@email.com", "category": "Email", "confidence": 0.95, "offset": 0, "length": 14}
+        ],
+        "redacted_text": "***@email.com",
+        "error": None,
+        "hint": None,
+    }
+
+
+def _pii_result_phone_and_email() -> dict:
+    """check_for_pii() result with a phone number and an email finding."""
+    return {
+        "pii_detected": True,
+        "findings": [
+            {"text": "555-1234", "category": "PhoneNumber", "confidence": 0.9, "offset": 0, "length": 8},
+            {"text": "john@example.com", "category": "Email", "confidence": 0.95, "offset": 10, "length": 16},
+        ],
+        "redacted_text": "*** and ***",
+        "error": None,
+        "hint": None,
+    }
+
+
+def _drain(iterator) -> None:
+    """Consume an iterator purely for its side effects, discarding each item."""
+    deque(iterator, maxlen=0)
+
+
+@pytest.fixture
+def make_result():
+    """Factory fixture to create a successful PipelineResult from the baseline plus overrides."""
+    def _create(**overrides) -> PipelineResult:
+        overrides.setdefault("stages_completed", list(_ALL_STAGES))
+        return PipelineResult(**{**dict(_BASE_RESULT), **overrides})
+    return _create
+
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -121,17 +195,16 @@ class TestAppStartedEvent:
     """app_started emitted in main()."""
 
     @pytest.mark.unit
-    def test_app_started_emitted(self, monkeypatch):
+    def test_app_started_emitted(self, monkeypatch, mocker):
         """main() calls init_telemetry and emits app_started."""
         import web_app
 
         mock_init = MagicMock()
-        mock_track = MagicMock()
+        mock_track = mocker.patch("telemetry.track_event")
         mock_enabled = MagicMock(return_value=True)
         mock_active = MagicMock(return_value=True)
 
         monkeypatch.setattr("telemetry.init_telemetry", mock_init)
-        monkeypatch.setattr("telemetry.track_event", mock_track)
         monkeypatch.setattr("telemetry.is_telemetry_enabled", mock_enabled)
         monkeypatch.setattr("telemetry.is_active", mock_active)
         # Prevent Flask from actually starting
@@ -168,12 +241,12 @@ class TestAppStartedEvent:
         assert "run_mode" in props
 
     @pytest.mark.unit
-    def test_opt_out_logged(self, monkeypatch, capsys):
+    def test_opt_out_logged(self, monkeypatch, mocker, capsys):
         """main() logs telemetry disabled status when opted out."""
         import web_app
 
         monkeypatch.setattr("telemetry.init_telemetry", MagicMock())
-        monkeypatch.setattr("telemetry.track_event", MagicMock())
+        mocker.patch("telemetry.track_event")
         monkeypatch.setattr("telemetry.is_telemetry_enabled", MagicMock(return_value=False))
         monkeypatch.setattr(web_app.app, "run", MagicMock())
         monkeypatch.setattr("threading.Timer", MagicMock())
@@ -191,38 +264,16 @@ class TestTsgGeneratedEvent:
     """tsg_generated emitted on successful pipeline result."""
 
     @pytest.mark.unit
-    def test_tsg_generated_emitted(self, monkeypatch):
+    def test_tsg_generated_emitted(self, mocker, make_result):
         """Success path emits tsg_generated with all required fields."""
         from web_app import generate_pipeline_sse_events
-        from pipeline import PipelineResult, PipelineStage
 
-        mock_result = PipelineResult(
-            success=True,
-            tsg_content="# Test TSG",
-            questions_content="NO_MISSING",
-            research_report="Research report",
-            thread_id="conv_123",
-            stages_completed=[PipelineStage.RESEARCH, PipelineStage.WRITE, PipelineStage.REVIEW],
-            duration_seconds=42.5,
-            research_duration_s=10.0,
-            write_duration_s=20.0,
-            review_duration_s=12.5,
-            research_input_tokens=1000,
-            research_output_tokens=500,
-            write_input_tokens=800,
-            write_output_tokens=400,
-            review_input_tokens=600,
-            review_output_tokens=300,
-            total_tokens=3600,
-            notes_line_count=25,
-            image_count=2,
-        )
+        mock_result = make_result()
 
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         with patch("web_app.run_pipeline", return_value=mock_result):
-            list(generate_pipeline_sse_events("test notes"))  # drain generator for side effects
+            _drain(generate_pipeline_sse_events("test notes"))
 
         # Find tsg_generated call
         tsg_calls = [c for c in mock_track.call_args_list if c[0][0] == "tsg_generated"]
@@ -241,25 +292,20 @@ class TestTsgGeneratedEvent:
         assert measurements["image_count"] == 2
 
     @pytest.mark.unit
-    def test_tsg_generated_with_missing(self, monkeypatch):
+    def test_tsg_generated_with_missing(self, mocker, make_result):
         """tsg_generated event includes missing_sections when present."""
         from web_app import generate_pipeline_sse_events
-        from pipeline import PipelineResult, PipelineStage
 
-        mock_result = PipelineResult(
-            success=True,
+        mock_result = make_result(
             tsg_content="# TSG with {{MISSING::Cause::hint}}",
             questions_content="- {{MISSING::Cause::hint}} -> What caused it?\n- {{MISSING::Diagnosis::hint}} -> How to diagnose?",
-            research_report="Research",
             thread_id="conv_456",
-            stages_completed=[PipelineStage.RESEARCH, PipelineStage.WRITE, PipelineStage.REVIEW],
         )
 
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         with patch("web_app.run_pipeline", return_value=mock_result):
-            list(generate_pipeline_sse_events("test notes"))
+            _drain(generate_pipeline_sse_events("test notes"))
 
         tsg_calls = [c for c in mock_track.call_args_list if c[0][0] == "tsg_generated"]
         assert len(tsg_calls) == 1
@@ -279,11 +325,11 @@ class TestPipelineErrorEvent:
     """pipeline_error emitted on pipeline failure."""
 
     @pytest.mark.unit
-    def test_pipeline_error_from_failed_result(self, monkeypatch):
+    def test_pipeline_error_from_failed_result(self, mocker):
         """pipeline_error emitted when result.success is False."""
         from web_app import generate_pipeline_sse_events
-        from pipeline import PipelineResult, PipelineStage
 
+        # Built from PipelineResult defaults: a failed run has no content, tokens or durations
         mock_result = PipelineResult(
             success=False,
             error="Pipeline research failed: rate limit",
@@ -293,11 +339,10 @@ class TestPipelineErrorEvent:
         mock_result.metadata["error_stage"] = "research"
         mock_result.metadata["error_class"] = "rate_limit"
 
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         with patch("web_app.run_pipeline", return_value=mock_result):
-            list(generate_pipeline_sse_events("test notes"))
+            _drain(generate_pipeline_sse_events("test notes"))
 
         error_calls = [c for c in mock_track.call_args_list if c[0][0] == "pipeline_error"]
         assert len(error_calls) == 1
@@ -308,21 +353,20 @@ class TestPipelineErrorEvent:
         assert measurements["retry_count"] == 2
 
     @pytest.mark.unit
-    def test_pipeline_error_from_exception(self, monkeypatch):
+    def test_pipeline_error_from_exception(self, mocker):
         """pipeline_error emitted when run_pipeline raises PipelineError."""
         from web_app import generate_pipeline_sse_events
-        from pipeline import PipelineError, PipelineStage
+        from pipeline import PipelineError
 
         error = PipelineError(
             stage=PipelineStage.WRITE,
             original_error=RuntimeError("Connection timed out"),
         )
 
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         with patch("web_app.run_pipeline", side_effect=error):
-            list(generate_pipeline_sse_events("test notes"))
+            _drain(generate_pipeline_sse_events("test notes"))
 
         error_calls = [c for c in mock_track.call_args_list if c[0][0] == "pipeline_error"]
         assert len(error_calls) == 1
@@ -331,15 +375,14 @@ class TestPipelineErrorEvent:
         assert props["version"]
 
     @pytest.mark.unit
-    def test_pipeline_error_unknown_for_non_pipeline_exception(self, monkeypatch):
+    def test_pipeline_error_unknown_for_non_pipeline_exception(self, mocker):
         """pipeline_error uses 'unknown' stage for non-PipelineError exceptions."""
         from web_app import generate_pipeline_sse_events
 
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         with patch("web_app.run_pipeline", side_effect=ValueError("config problem")):
-            list(generate_pipeline_sse_events("test notes"))
+            _drain(generate_pipeline_sse_events("test notes"))
 
         error_calls = [c for c in mock_track.call_args_list if c[0][0] == "pipeline_error"]
         assert len(error_calls) == 1
@@ -356,20 +399,11 @@ class TestPiiBlockedEvent:
     """pii_blocked emitted when PII gate triggers."""
 
     @pytest.mark.unit
-    def test_pii_blocked_on_generate(self, client, monkeypatch):
+    def test_pii_blocked_on_generate(self, client, mocker):
         """PII in notes triggers pii_blocked with input_type=notes."""
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
-
-        pii_result = {
-            "pii_detected": True,
-            "findings": [
-                {"text": "test@email.com", "category": "Email", "confidence": 0.95, "offset": 0, "length": 14}
-            ],
-            "redacted_text": "***@email.com",
-            "error": None,
-            "hint": None,
-        }
+        mock_track = mocker.patch("telemetry.track_event")
+        pii_result = _pii_result_email()
+
         with patch("web_app.check_for_pii", return_value=pii_result):
             response = client.post(
                 "/api/generate/stream",
@@ -377,6 +411,7 @@ class TestPiiBlockedEvent:
             )
 
         assert response.status_code == 400
+        assert pii_result == _pii_result_email(), "PII gate must not mutate the check_for_pii result"
 
         pii_calls = [c for c in mock_track.call_args_list if c[0][0] == "pii_blocked"]
         assert len(pii_calls) == 1
@@ -387,11 +422,10 @@ class TestPiiBlockedEvent:
         assert measurements["entity_count"] == 1
 
     @pytest.mark.unit
-    def test_pii_blocked_on_answer(self, client, monkeypatch):
+    def test_pii_blocked_on_answer(self, client, mocker):
         """PII in follow-up answers triggers pii_blocked with input_type=followup."""
         import web_app
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         # Set up a valid session
         web_app.sessions["test-thread-123"] = {
@@ -401,17 +435,7 @@ class TestPiiBlockedEvent:
             "research_report": "research",
         }
 
-        pii_result = {
-            "pii_detected": True,
-            "findings": [
-                {"text": "555-1234", "category": "PhoneNumber", "confidence": 0.9, "offset": 0, "length": 8},
-                {"text": "john@example.com", "category": "Email", "confidence": 0.95, "offset": 10, "length": 16},
-            ],
-            "redacted_text": "*** and ***",
-            "error": None,
-            "hint": None,
-        }
-        with patch("web_app.check_for_pii", return_value=pii_result):
+        with patch("web_app.check_for_pii", return_value=_pii_result_phone_and_email()):
             response = client.post(
                 "/api/answer/stream",
                 json={"thread_id": "test-thread-123", "answers": "Call 555-1234 or john@example.com"},
@@ -426,9 +450,6 @@ class TestPiiBlockedEvent:
         measurements = pii_calls[0][1]["measurements"]
         assert measurements["entity_count"] == 2
 
-        # Clean up
-        web_app.sessions.pop("test-thread-123", None)
-
 
 # =============================================================================
 # SETUP_COMPLETED EVENT
@@ -438,10 +459,9 @@ class TestSetupCompletedEvent:
     """setup_completed emitted on successful agent creation."""
 
     @pytest.mark.unit
-    def test_setup_completed_emitted(self, client, monkeypatch):
+    def test_setup_completed_emitted(self, client, monkeypatch, mocker):
         """Successful agent creation emits setup_completed."""
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
         monkeypatch.setenv("PROJECT_ENDPOINT", "https://test.services.ai.azure.com/api/projects/test-project")
         monkeypatch.setenv("MODEL_DEPLOYMENT_NAME", "gpt-5.2")
         monkeypatch.setenv("AGENT_NAME", "TestTSG")
@@ -457,9 +477,9 @@ class TestSetupCompletedEvent:
         mock_deployment.name = "gpt-5.2"
         mock_deployment.model_name = "gpt-5.2"
 
+        # MagicMock supports the context-manager protocol natively; the
+        # endpoint uses `with project:` without binding, so no __enter__ setup
         mock_project = MagicMock()
-        mock_project.__enter__ = MagicMock(return_value=mock_project)
-        mock_project.__exit__ = MagicMock(return_value=False)
         mock_project.agents.create_version.return_value = mock_agent
         mock_project.deployments.get.return_value = mock_deployment
 
@@ -468,7 +488,7 @@ class TestSetupCompletedEvent:
             response = client.post("/api/create-agent")
 
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data["success"] is True
 
         setup_calls = [c for c in mock_track.call_args_list if c[0][0] == "setup_completed"]
@@ -486,10 +506,9 @@ class TestTsgCopiedEvent:
     """tsg_copied endpoint works correctly."""
 
     @pytest.mark.unit
-    def test_copied_returns_204(self, client, monkeypatch):
+    def test_copied_returns_204(self, client, mocker):
         """POST /api/telemetry/copied returns 204."""
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         response = client.post(
             "/api/telemetry/copied",
@@ -498,10 +517,9 @@ class TestTsgCopiedEvent:
         assert response.status_code == 204
 
     @pytest.mark.unit
-    def test_copied_emits_event(self, client, monkeypatch):
+    def test_copied_emits_event(self, client, mocker):
         """POST /api/telemetry/copied emits tsg_copied event with action."""
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         client.post(
             "/api/telemetry/copied",
@@ -516,10 +534,9 @@ class TestTsgCopiedEvent:
         assert props["version"]
 
     @pytest.mark.unit
-    def test_copied_no_body(self, client, monkeypatch):
+    def test_copied_no_body(self, client, mocker):
         """POST /api/telemetry/copied works with no body (defaults action to copy)."""
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         response = client.post("/api/telemetry/copied")
         assert response.status_code == 204
@@ -531,10 +548,9 @@ class TestTsgCopiedEvent:
         assert props["action"] == "copy"
 
     @pytest.mark.unit
-    def test_download_emits_event(self, client, monkeypatch):
+    def test_download_emits_event(self, client, mocker):
         """POST /api/telemetry/copied with action=download emits correctly."""
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         client.post(
             "/api/telemetry/copied",
@@ -556,34 +572,25 @@ class TestFollowUpRoundTracking:
     """follow_up_round is tracked correctly in sessions."""
 
     @pytest.mark.unit
-    def test_initial_generation_round_zero(self, monkeypatch):
+    def test_initial_generation_round_zero(self, mocker, make_result):
         """Initial generation uses follow_up_round=0."""
         from web_app import generate_pipeline_sse_events
-        from pipeline import PipelineResult, PipelineStage
 
-        mock_result = PipelineResult(
-            success=True,
-            tsg_content="# TSG",
-            questions_content="NO_MISSING",
-            thread_id="conv_100",
-            stages_completed=[PipelineStage.RESEARCH, PipelineStage.WRITE, PipelineStage.REVIEW],
-        )
+        mock_result = make_result(thread_id="conv_100")
 
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         with patch("web_app.run_pipeline", return_value=mock_result):
-            list(generate_pipeline_sse_events("test notes"))
+            _drain(generate_pipeline_sse_events("test notes"))
 
         tsg_calls = [c for c in mock_track.call_args_list if c[0][0] == "tsg_generated"]
         assert tsg_calls[0][1]["properties"]["follow_up_round"] == "0"
 
     @pytest.mark.unit
-    def test_follow_up_increments_round(self, monkeypatch):
+    def test_follow_up_increments_round(self, mocker, make_result):
         """Follow-up generation uses incremented round from session."""
         import web_app
         from web_app import generate_pipeline_sse_events
-        from pipeline import PipelineResult, PipelineStage
 
         # Set up a session with round 0
         web_app.sessions["conv_200"] = {
@@ -594,52 +601,35 @@ class TestFollowUpRoundTracking:
             "follow_up_round": 0,
         }
 
-        mock_result = PipelineResult(
-            success=True,
+        mock_result = make_result(
             tsg_content="# Updated TSG",
-            questions_content="NO_MISSING",
             thread_id="conv_200",
             stages_completed=[PipelineStage.WRITE, PipelineStage.REVIEW],
         )
 
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         with patch("web_app.run_pipeline", return_value=mock_result):
-            list(generate_pipeline_sse_events("notes", thread_id="conv_200", answers="answer"))
+            _drain(generate_pipeline_sse_events("notes", thread_id="conv_200", answers="answer"))
 
         tsg_calls = [c for c in mock_track.call_args_list if c[0][0] == "tsg_generated"]
         assert tsg_calls[0][1]["properties"]["follow_up_round"] == "1"
 
-        # Clean up
-        web_app.sessions.pop("conv_200", None)
-
     @pytest.mark.unit
-    def test_follow_up_round_stored_in_session(self, monkeypatch):
+    def test_follow_up_round_stored_in_session(self, mocker, make_result):
         """follow_up_round is persisted in session data on success."""
         import web_app
         from web_app import generate_pipeline_sse_events
-        from pipeline import PipelineResult, PipelineStage
 
-        mock_result = PipelineResult(
-            success=True,
-            tsg_content="# TSG",
-            questions_content="NO_MISSING",
-            thread_id="conv_300",
-            stages_completed=[PipelineStage.RESEARCH, PipelineStage.WRITE, PipelineStage.REVIEW],
-        )
+        mock_result = make_result(thread_id="conv_300")
 
-        mock_track = MagicMock()
-        monkeypatch.setattr("telemetry.track_event", mock_track)
+        mock_track = mocker.patch("telemetry.track_event")
 
         with patch("web_app.run_pipeline", return_value=mock_result):
-            list(generate_pipeline_sse_events("notes"))
+            _drain(generate_pipeline_sse_events("notes"))
 
         assert web_app.sessions["conv_300"]["follow_up_round"] == 0
 
-        # Clean up
-        web_app.sessions.pop("conv_300", None)
-
 
 # =============================================================================
 # ERROR METADATA IN PIPELINE RESULT
@@ -651,7 +641,6 @@ class TestPipelineErrorMetadata:
     @pytest.mark.unit
     def test_error_metadata_populated(self):
         """PipelineResult metadata stores error_stage and error_class."""
-        from pipeline import PipelineResult
         result = PipelineResult(success=False, error="test error")
         result.metadata["error_stage"] = "research"
         result.metadata["error_class"] = "timeout"
@@ -662,7 +651,6 @@ class TestPipelineErrorMetadata:
     @pytest.mark.unit
     def test_error_metadata_defaults_empty(self):
         """PipelineResult metadata defaults to empty dict."""
-        from pipeline import PipelineResult
         result = PipelineResult(success=False)
         assert result.metadata == {}
         assert result.metadata.get("error_stage", "unknown") == "unknown"
@@ -1,7 +1,8 @@
 """
 test_tsg_validation.py — Tests for TSG output validation.
 
-Tests the validate_tsg_output() function from tsg_constants.py.
+Tests the validate_tsg_output() function from tsg_constants.py, plus the
+research/review block extractors that share its marker scanning.
 
 Run with: pytest tests/test_tsg_validation.py -v
 """
@@ -9,6 +10,12 @@ Run with: pytest tests/test_tsg_validation.py -v
 import pytest
 from tsg_constants import (
     validate_tsg_output,
+    extract_research_block,
+    extract_review_block,
+    RESEARCH_BEGIN,
+    RESEARCH_END,
+    REVIEW_BEGIN,
+    REVIEW_END,
     TSG_BEGIN,
     TSG_END,
     QUESTIONS_BEGIN,
@@ -19,19 +26,49 @@ from tsg_constants import (
 )
 
 
+# Marker name -> marker string
+_MARKERS = {
+    "TSG_BEGIN": TSG_BEGIN,
+    "TSG_END": TSG_END,
+    "QUESTIONS_BEGIN": QUESTIONS_BEGIN,
+    "QUESTIONS_END": QUESTIONS_END,
+}
+
+
+def build_response(content: str, questions: str = "NO_MISSING", omit: str | None = None) -> str:
+    """Wrap TSG content and a questions block in the four output markers.
+    
+    *omit* names one marker in _MARKERS (e.g. "TSG_END") to leave out.
+    """
+    m = {name: "" if name == omit else marker for name, marker in _MARKERS.items()}
+    return f"""
+{m["TSG_BEGIN"]}
+{content}
+{m["TSG_END"]}
+
+{m["QUESTIONS_BEGIN"]}
+{questions}
+{m["QUESTIONS_END"]}
+"""
+
+
+_PLACEHOLDER = "{{MISSING::Section::Hint}}"
+
+_HEADINGS_BLOCK = "\n\n".join(REQUIRED_TSG_HEADINGS)
+
+
 # =============================================================================
 # FIXTURES: Sample TSG Content
 # =============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def valid_tsg_content():
     """Create a complete valid TSG content block."""
-    headings = "\n\n".join(REQUIRED_TSG_HEADINGS)
     return f"""{REQUIRED_TOC}
 
 # **Sample Issue Title**
 
-{headings}
+{_HEADINGS_BLOCK}
 
 {REQUIRED_DIAGNOSIS_LINE}
 
@@ -42,15 +79,7 @@ Some content here.
 @pytest.fixture
 def valid_tsg_response(valid_tsg_content):
     """Create a complete valid TSG response with all markers."""
-    return f"""
-{TSG_BEGIN}
-{valid_tsg_content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-{QUESTIONS_END}
-"""
+    return build_response(valid_tsg_content)
 
 
 @pytest.fixture
@@ -60,15 +89,10 @@ def valid_tsg_with_missing(valid_tsg_content):
         "Some content here.",
         "{{MISSING::Cause::What is the root cause?}}"
     )
-    return f"""
-{TSG_BEGIN}
-{content_with_missing}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-- {{{{MISSING::Cause::What is the root cause?}}}} -> What was the root cause of the issue?
-{QUESTIONS_END}
-"""
+    return build_response(
+        content_with_missing,
+        "- {{MISSING::Cause::What is the root cause?}} -> What was the root cause of the issue?",
+    )
 
 
 # =============================================================================
@@ -113,64 +137,12 @@ class TestMissingMarkers:
     """Tests for missing required markers."""
     
     @pytest.mark.unit
-    def test_missing_tsg_begin_marker(self, valid_tsg_content):
-        """Missing TSG_BEGIN marker should fail validation."""
-        response = f"""
-{valid_tsg_content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-{QUESTIONS_END}
-"""
-        result = validate_tsg_output(response)
+    @pytest.mark.parametrize("omitted", list(_MARKERS))
+    def test_missing_single_marker(self, valid_tsg_content, omitted):
+        """Omitting any one of the four markers should fail validation and name it."""
+        result = validate_tsg_output(build_response(valid_tsg_content, omit=omitted))
         assert result["valid"] is False
-        assert any("TSG_BEGIN" in issue for issue in result["issues"])
-    
-    @pytest.mark.unit
-    def test_missing_tsg_end_marker(self, valid_tsg_content):
-        """Missing TSG_END marker should fail validation."""
-        response = f"""
-{TSG_BEGIN}
-{valid_tsg_content}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-{QUESTIONS_END}
-"""
-        result = validate_tsg_output(response)
-        assert result["valid"] is False
-        assert any("TSG_END" in issue for issue in result["issues"])
-    
-    @pytest.mark.unit
-    def test_missing_questions_begin_marker(self, valid_tsg_content):
-        """Missing QUESTIONS_BEGIN marker should fail validation."""
-        response = f"""
-{TSG_BEGIN}
-{valid_tsg_content}
-{TSG_END}
-
-NO_MISSING
-{QUESTIONS_END}
-"""
-        result = validate_tsg_output(response)
-        assert result["valid"] is False
-        assert any("QUESTIONS_BEGIN" in issue for issue in result["issues"])
-    
-    @pytest.mark.unit
-    def test_missing_questions_end_marker(self, valid_tsg_content):
-        """Missing QUESTIONS_END marker should fail validation."""
-        response = f"""
-{TSG_BEGIN}
-{valid_tsg_content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-"""
-        result = validate_tsg_output(response)
-        assert result["valid"] is False
-        assert any("QUESTIONS_END" in issue for issue in result["issues"])
+        assert f"Missing {_MARKERS[omitted]} marker" in result["issues"]
     
     @pytest.mark.unit
     def test_missing_all_markers(self):
@@ -192,59 +164,34 @@ class TestMissingContent:
     def test_missing_toc(self):
         """Missing [[_TOC_]] should fail validation."""
         # Create content without TOC
-        headings = "\n\n".join(REQUIRED_TSG_HEADINGS)
         content = f"""
-{headings}
+{_HEADINGS_BLOCK}
 
 {REQUIRED_DIAGNOSIS_LINE}
 """
-        response = f"""
-{TSG_BEGIN}
-{content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-{QUESTIONS_END}
-"""
+        response = build_response(content)
         result = validate_tsg_output(response)
         assert result["valid"] is False
-        assert any("table of contents" in issue.lower() for issue in result["issues"])
+        assert f"Missing required table of contents: {REQUIRED_TOC}" in result["issues"]
     
     @pytest.mark.unit
     def test_missing_required_heading(self, valid_tsg_content):
         """Missing a required heading should fail validation."""
         # Remove one of the required section headings
         content = valid_tsg_content.replace("# **Cause**", "")
-        response = f"""
-{TSG_BEGIN}
-{content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-{QUESTIONS_END}
-"""
+        response = build_response(content)
         result = validate_tsg_output(response)
         assert result["valid"] is False
-        assert any("Cause" in issue for issue in result["issues"])
+        assert "Missing required heading: # **Cause**" in result["issues"]
     
     @pytest.mark.unit
     def test_missing_diagnosis_line(self, valid_tsg_content):
         """Missing required diagnosis line should fail validation."""
         content = valid_tsg_content.replace(REQUIRED_DIAGNOSIS_LINE, "")
-        response = f"""
-{TSG_BEGIN}
-{content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-{QUESTIONS_END}
-"""
+        response = build_response(content)
         result = validate_tsg_output(response)
         assert result["valid"] is False
-        assert any("diagnosis line" in issue.lower() for issue in result["issues"])
+        assert "Missing required diagnosis line" in result["issues"]
 
 
 # =============================================================================
@@ -255,69 +202,30 @@ class TestQuestionsBlock:
     """Tests for questions block validation logic."""
     
     @pytest.mark.unit
-    def test_missing_placeholder_with_no_missing(self, valid_tsg_content):
-        """TSG without placeholders should have NO_MISSING in questions block."""
-        response = f"""
-{TSG_BEGIN}
-{valid_tsg_content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-{QUESTIONS_END}
-"""
-        result = validate_tsg_output(response)
-        assert result["valid"] is True
-    
-    @pytest.mark.unit
-    def test_has_placeholder_but_says_no_missing(self, valid_tsg_content):
-        """TSG with placeholders but NO_MISSING in questions should fail."""
-        content_with_placeholder = valid_tsg_content + "\n{{MISSING::Section::Hint}}"
-        response = f"""
-{TSG_BEGIN}
-{content_with_placeholder}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-NO_MISSING
-{QUESTIONS_END}
-"""
-        result = validate_tsg_output(response)
-        assert result["valid"] is False
-        assert any("NO_MISSING" in issue for issue in result["issues"])
-    
-    @pytest.mark.unit
-    def test_no_placeholder_but_not_no_missing(self, valid_tsg_content):
-        """TSG without placeholders but questions block not NO_MISSING should fail."""
-        response = f"""
-{TSG_BEGIN}
-{valid_tsg_content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-Some other content
-{QUESTIONS_END}
-"""
-        result = validate_tsg_output(response)
-        assert result["valid"] is False
-        assert any("not NO_MISSING" in issue for issue in result["issues"])
-    
-    @pytest.mark.unit
-    def test_has_placeholder_but_no_questions_listed(self, valid_tsg_content):
-        """TSG with placeholders but questions block doesn't list them should fail."""
-        content_with_placeholder = valid_tsg_content + "\n{{MISSING::Section::Hint}}"
-        response = f"""
-{TSG_BEGIN}
-{content_with_placeholder}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-Just some text without the proper format
-{QUESTIONS_END}
-"""
-        result = validate_tsg_output(response)
-        assert result["valid"] is False
-        assert any("doesn't list" in issue for issue in result["issues"])
+    @pytest.mark.parametrize(
+        "has_placeholder, questions, expected_issue",
+        [
+            (False, "NO_MISSING", None),
+            (True, "NO_MISSING", "TSG has {{MISSING::...}} placeholders but questions block says NO_MISSING"),
+            (False, "Some other content", "TSG has no placeholders but questions block is not NO_MISSING"),
+            (True, "Just some text without the proper format", "TSG has placeholders but questions block doesn't list them"),
+        ],
+        ids=[
+            "no_placeholder_no_missing",
+            "placeholder_but_no_missing",
+            "no_placeholder_but_not_no_missing",
+            "placeholder_but_not_listed",
+        ],
+    )
+    def test_questions_block_consistency(self, valid_tsg_content, has_placeholder, questions, expected_issue):
+        """Questions block must agree with whether the TSG has {{MISSING::...}} placeholders."""
+        content = valid_tsg_content + f"\n{_PLACEHOLDER}" if has_placeholder else valid_tsg_content
+        result = validate_tsg_output(build_response(content, questions))
+        if expected_issue is None:
+            assert result["valid"] is True
+        else:
+            assert result["valid"] is False
+            assert expected_issue in result["issues"]
 
 
 # =============================================================================
@@ -328,11 +236,24 @@ class TestEdgeCases:
     """Tests for edge cases and boundary conditions."""
     
     @pytest.mark.unit
-    def test_empty_response(self):
-        """Empty response should fail with multiple issues."""
-        result = validate_tsg_output("")
+    @pytest.mark.parametrize("response", ["", "  \n\t "], ids=["empty", "whitespace"])
+    def test_empty_response(self, response):
+        """Empty or whitespace-only response should fail with multiple issues."""
+        result = validate_tsg_output(response)
         assert result["valid"] is False
         assert len(result["issues"]) >= 4
+        assert f"Missing {TSG_BEGIN} marker" in result["issues"]
+        assert f"Missing required table of contents: {REQUIRED_TOC}" in result["issues"]
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("response", ["", "  \n\t "], ids=["empty", "whitespace"])
+    def test_blank_response_skips_block_scan(self, response, mocker):
+        """Blank input returns early with the same issues a marker-less response gets."""
+        find_block = mocker.patch("tsg_constants.find_block")
+        result = validate_tsg_output(response)
+        find_block.assert_not_called()
+        mocker.stopall()
+        assert result == validate_tsg_output("no markers")
     
     @pytest.mark.unit
     def test_markers_in_wrong_order(self, valid_tsg_content):
@@ -351,18 +272,38 @@ NO_MISSING
         assert result["tsg_content"] == ""
         assert result["valid"] is False
     
+    @pytest.mark.unit
+    def test_stray_end_marker_before_begin(self, valid_tsg_response, valid_tsg_content):
+        """An end marker before the begin marker shouldn't truncate the extracted block."""
+        result = validate_tsg_output(f"{TSG_END}\n{QUESTIONS_END}\n{valid_tsg_response}")
+        assert result["tsg_content"].strip() == valid_tsg_content.strip()
+        assert result["questions_content"] == "NO_MISSING"
+        assert result["valid"] is True
+    
     @pytest.mark.unit
     def test_whitespace_in_questions_content(self, valid_tsg_content):
         """Questions content should be stripped of whitespace."""
-        response = f"""
-{TSG_BEGIN}
-{valid_tsg_content}
-{TSG_END}
-
-{QUESTIONS_BEGIN}
-   NO_MISSING   
-{QUESTIONS_END}
-"""
-        result = validate_tsg_output(response)
+        result = validate_tsg_output(build_response(valid_tsg_content, "   NO_MISSING   "))
         assert result["questions_content"] == "NO_MISSING"
         assert result["valid"] is True
+
+
+class TestStageBlockExtraction:
+    """Research and review blocks are taken from the first begin marker onward."""
+
+    @pytest.mark.unit
+    def test_research_block_after_stray_end_marker(self):
+        """A stray end marker before the begin marker does not truncate the block."""
+        response = f"See {RESEARCH_END} below.\n{RESEARCH_BEGIN}\nFindings\n{RESEARCH_END}"
+        assert extract_research_block(response) == "Findings"
+
+    @pytest.mark.unit
+    def test_research_block_missing_end_marker(self):
+        """No block is returned when the end marker is missing."""
+        assert extract_research_block(f"{RESEARCH_BEGIN}\nFindings") is None
+
+    @pytest.mark.unit
+    def test_review_block_parses_json(self):
+        """The review block body is parsed as JSON."""
+        response = f"{REVIEW_BEGIN}\n{{\"approved\": true}}\n{REVIEW_END}"
+        assert extract_review_block(response) == {"approved": True}
@@ -241,7 +241,7 @@ class TestAboutVersionFields:
     def test_about_includes_update_fields(self, client):
         """About response should include latest_version, update_url, update_check_enabled."""
         response = client.get("/api/about")
-        data = json.loads(response.data)
+        data = response.get_json()
 
         assert "latest_version" in data
         assert "update_url" in data
@@ -255,7 +255,7 @@ class TestAboutVersionFields:
         monkeypatch.setattr(web_app, "_update_url", "https://example.com/release")
 
         response = client.get("/api/about")
-        data = json.loads(response.data)
+        data = response.get_json()
 
         assert data["latest_version"] == "2.0.0"
         assert data["update_url"] == "https://example.com/release"
@@ -268,7 +268,7 @@ class TestAboutVersionFields:
         monkeypatch.setattr(web_app, "_update_url", None)
 
         response = client.get("/api/about")
-        data = json.loads(response.data)
+        data = response.get_json()
 
         assert data["latest_version"] is None
         assert data["update_url"] is None
@@ -279,7 +279,7 @@ class TestAboutVersionFields:
         monkeypatch.delenv("TSG_UPDATE_CHECK", raising=False)
 
         response = client.get("/api/about")
-        data = json.loads(response.data)
+        data = response.get_json()
 
         assert data["update_check_enabled"] is True
 
@@ -289,6 +289,6 @@ class TestAboutVersionFields:
         monkeypatch.setenv("TSG_UPDATE_CHECK", "0")
 
         response = client.get("/api/about")
-        data = json.loads(response.data)
+        data = response.get_json()
 
         assert data["update_check_enabled"] is False
@@ -2,6 +2,9 @@
 Shared TSG template, markers, and instruction text.
 """
 
+import json
+import re
+
 TSG_TEMPLATE = """[[_TOC_]]
 
 # **<Your Title Here>**
@@ -78,39 +81,61 @@ REQUIRED_TSG_HEADINGS = [
     "# **Tags or Prompts**",
 ]
 
+# First H1 after the TOC is the title (e.g. "# **Some Title**")
+_TITLE_HEADING_RE = re.compile(r'\[\[_TOC_\]\]\s*\n+\s*# \*\*[^*]+\*\*')
+
+# Issues for a blank response: every marker, the TOC, each heading and the diagnosis line are missing
+_BLANK_RESPONSE_ISSUES = (
+    f"Missing {TSG_BEGIN} marker",
+    f"Missing {TSG_END} marker",
+    f"Missing {QUESTIONS_BEGIN} marker",
+    f"Missing {QUESTIONS_END} marker",
+    f"Missing required table of contents: {REQUIRED_TOC}",
+    *(f"Missing required heading: {heading}" for heading in REQUIRED_TSG_HEADINGS),
+    "Missing required diagnosis line",
+)
+
 
 def validate_tsg_output(response_text: str) -> dict:
     """
     Validate that the agent response follows the required format.
     Returns a dict with 'valid' bool and 'issues' list.
     """
+    # Nothing to scan in a blank response
+    if not response_text or response_text.isspace():
+        return {
+            "valid": False,
+            "issues": list(_BLANK_RESPONSE_ISSUES),
+            "tsg_content": "",
+            "questions_content": "",
+        }
+    
     issues = []
     
+    # Extract both blocks; only re-scan for individual markers when a block is incomplete
+    tsg_block = find_block(response_text, TSG_BEGIN, TSG_END)
+    questions_block = find_block(response_text, QUESTIONS_BEGIN, QUESTIONS_END)
+    
     # Check for required markers
-    if TSG_BEGIN not in response_text:
-        issues.append("Missing <!-- TSG_BEGIN --> marker")
-    if TSG_END not in response_text:
-        issues.append("Missing <!-- TSG_END --> marker")
-    if QUESTIONS_BEGIN not in response_text:
-        issues.append("Missing <!-- QUESTIONS_BEGIN --> marker")
-    if QUESTIONS_END not in response_text:
-        issues.append("Missing <!-- QUESTIONS_END --> marker")
+    if tsg_block is None:
+        if TSG_BEGIN not in response_text:
+            issues.append("Missing <!-- TSG_BEGIN --> marker")
+        if TSG_END not in response_text:
+            issues.append("Missing <!-- TSG_END --> marker")
+    if questions_block is None:
+        if QUESTIONS_BEGIN not in response_text:
+            issues.append("Missing <!-- QUESTIONS_BEGIN --> marker")
+        if QUESTIONS_END not in response_text:
+            issues.append("Missing <!-- QUESTIONS_END --> marker")
     
-    # Extract TSG content
-    tsg_content = ""
-    if TSG_BEGIN in response_text and TSG_END in response_text:
-        start = response_text.find(TSG_BEGIN) + len(TSG_BEGIN)
-        end = response_text.find(TSG_END)
-        tsg_content = response_text[start:end]
+    tsg_content = tsg_block or ""
     
     # Check for required TOC
     if REQUIRED_TOC not in tsg_content:
         issues.append(f"Missing required table of contents: {REQUIRED_TOC}")
     
     # Check for title heading (first H1 after TOC should be the title, not "# **Title**")
-    import re
-    title_pattern = re.compile(r'\[\[_TOC_\]\]\s*\n+\s*# \*\*[^*]+\*\*')
-    if tsg_content and not title_pattern.search(tsg_content):
+    if tsg_content and not _TITLE_HEADING_RE.search(tsg_content):
         issues.append("Missing title heading after [[_TOC_]] (should be # **Your Title Here**)")
     
     # Check for required headings (excludes title since it's dynamic)
@@ -122,12 +147,7 @@ def validate_tsg_output(response_text: str) -> dict:
     if REQUIRED_DIAGNOSIS_LINE not in tsg_content:
         issues.append("Missing required diagnosis line")
     
-    # Extract questions block
-    questions_content = ""
-    if QUESTIONS_BEGIN in response_text and QUESTIONS_END in response_text:
-        start = response_text.find(QUESTIONS_BEGIN) + len(QUESTIONS_BEGIN)
-        end = response_text.find(QUESTIONS_END)
-        questions_content = response_text[start:end].strip()
+    questions_content = (questions_block or "").strip()
     
     # Check questions block validity
     if questions_content:
@@ -143,13 +163,28 @@ def validate_tsg_output(response_text: str) -> dict:
             issues.append("TSG has placeholders but questions block doesn't list them")
     
     return {
-        "valid": len(issues) == 0,
+        "valid": not issues,
         "issues": issues,
         "tsg_content": tsg_content,
         "questions_content": questions_content,
     }
 
 
+def find_block(text: str, begin: str, end: str) -> str | None:
+    """Return the text between the first *begin* marker and the next *end* marker after it.
+    
+    None if either marker is missing (or *end* only appears before *begin*).
+    """
+    i = text.find(begin)
+    if i == -1:
+        return None
+    i += len(begin)
+    j = text.find(end, i)
+    if j == -1:
+        return None
+    return text[i:j]
+
+
 # =============================================================================
 # MULTI-STAGE PIPELINE PROMPTS
 # =============================================================================
@@ -511,37 +546,41 @@ def build_writer_prompt(notes: str, research: str, prior_tsg: str | None = None,
         user_answers: Optional answers to follow-up questions
         prior_review: Optional prior review result dict for iteration context
     """
-    import json as _json
-    prompt = WRITER_USER_PROMPT_TEMPLATE.format(
+    # Collect the sections and join once; notes, research and prior TSG can each be large
+    parts = [WRITER_USER_PROMPT_TEMPLATE.format(
         template=TSG_TEMPLATE,
         notes=notes,
         research=research,
-    )
+    )]
     if prior_tsg:
-        prompt += f"\n\n<prior_tsg>\n{prior_tsg}\n</prior_tsg>\n"
-    has_review_feedback = False
-    if prior_review:
-        # Include review feedback so the Writer knows what was flagged
-        review_summary = {
-            k: prior_review[k]
-            for k in ("accuracy_issues", "suggestions", "completeness_issues")
-            if prior_review.get(k)
-        }
-        if review_summary:
-            has_review_feedback = True
-            prompt += f"\n\n<prior_review_feedback>\n{_json.dumps(review_summary, indent=2)}\n</prior_review_feedback>\n"
+        parts.append(f"\n\n<prior_tsg>\n{prior_tsg}\n</prior_tsg>\n")
+    # Include review feedback so the Writer knows what was flagged
+    review_summary = _review_summary(prior_review)
+    if review_summary:
+        parts.append(f"\n\n<prior_review_feedback>\n{json.dumps(review_summary, indent=2)}\n</prior_review_feedback>\n")
     if user_answers:
-        prompt += f"\n\n<answers>\n{user_answers}\n</answers>\n"
-        if has_review_feedback:
-            prompt += (
+        parts.append(f"\n\n<answers>\n{user_answers}\n</answers>\n")
+        if review_summary:
+            parts.append(
                 "The user's answers address two things:\n"
                 "1. Answers to {{MISSING::...}} follow-up questions — replace the placeholders with these answers.\n"
                 "2. Responses to the reviewer's suggestions (shown in <prior_review_feedback>) — "
                 "apply suggestions the user accepted, and leave unchanged anything the user dismissed or ignored.\n"
             )
         else:
-            prompt += "Replace {{MISSING::...}} placeholders with these answers.\n"
-    return prompt
+            parts.append("Replace {{MISSING::...}} placeholders with these answers.\n")
+    return "".join(parts)
+
+
+def _review_summary(prior_review: dict | None) -> dict:
+    """Return the non-empty feedback lists from a prior review result."""
+    if not prior_review:
+        return {}
+    return {
+        k: prior_review[k]
+        for k in ("accuracy_issues", "suggestions", "completeness_issues")
+        if prior_review.get(k)
+    }
 
 
 def build_review_prompt(draft_tsg: str, research: str, notes: str, prior_review: dict | None = None, user_answers: str | None = None) -> str:
@@ -554,21 +593,16 @@ def build_review_prompt(draft_tsg: str, research: str, notes: str, prior_review:
         prior_review: Optional prior review result dict (to suppress repeat suggestions)
         user_answers: Optional user answers (to understand what was accepted/dismissed)
     """
-    import json as _json
     prompt = REVIEW_USER_PROMPT_TEMPLATE.format(
         draft_tsg=draft_tsg,
         research=research,
         notes=notes,
     )
-    if prior_review and user_answers:
-        review_summary = {
-            k: prior_review[k]
-            for k in ("accuracy_issues", "suggestions", "completeness_issues")
-            if prior_review.get(k)
-        }
+    if user_answers:
+        review_summary = _review_summary(prior_review)
         if review_summary:
             prompt += (
-                f"\n\n<prior_review>\n{_json.dumps(review_summary, indent=2)}\n</prior_review>\n"
+                f"\n\n<prior_review>\n{json.dumps(review_summary, indent=2)}\n</prior_review>\n"
                 f"\n<user_response_to_review>\n{user_answers}\n</user_response_to_review>\n"
                 "You raised the items in <prior_review> on a previous draft. "
                 "The user has seen them and responded in <user_response_to_review>. "
@@ -581,20 +615,15 @@ def build_review_prompt(draft_tsg: str, research: str, notes: str, prior_review:
 
 def extract_research_block(response: str) -> str | None:
     """Extract the research report from agent response."""
-    if RESEARCH_BEGIN in response and RESEARCH_END in response:
-        start = response.find(RESEARCH_BEGIN) + len(RESEARCH_BEGIN)
-        end = response.find(RESEARCH_END)
-        return response[start:end].strip()
-    return None
+    block = find_block(response, RESEARCH_BEGIN, RESEARCH_END)
+    return block.strip() if block is not None else None
 
 
 def extract_review_block(response: str) -> dict | None:
     """Extract and parse the review JSON from agent response."""
-    import json
-    if REVIEW_BEGIN in response and REVIEW_END in response:
-        start = response.find(REVIEW_BEGIN) + len(REVIEW_BEGIN)
-        end = response.find(REVIEW_END)
-        json_str = response[start:end].strip()
+    block = find_block(response, REVIEW_BEGIN, REVIEW_END)
+    if block is not None:
+        json_str = block.strip()
         try:
             return json.loads(json_str)
         except json.JSONDecodeError:
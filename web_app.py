@@ -15,11 +15,15 @@ if getattr(sys, 'frozen', False):
 
 import json
 import os
+import re
+import stat
 import subprocess
+import tempfile
 import threading
 import queue
 import uuid
 import webbrowser
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Generator
 
@@ -37,6 +41,7 @@ from tsg_constants import (
     TSG_END,
     QUESTIONS_BEGIN,
     QUESTIONS_END,
+    find_block,
     # Stage instructions for pipeline agents
     RESEARCH_STAGE_INSTRUCTIONS,
     WRITER_STAGE_INSTRUCTIONS,
@@ -46,6 +51,7 @@ from tsg_constants import (
 # Import pipeline for multi-stage generation
 from pipeline import (
     run_pipeline,
+    get_credential,
     CancelledError,
     classify_error,
     PipelineStage,
@@ -70,6 +76,8 @@ _latest_version: str | None = None
 _update_url: str | None = None
 _update_check_done: bool = False
 
+_SEMVER_RE = re.compile(r"^(\d+)\.(\d+)\.(\d+)(?:-(.+))?$")
+
 
 def _is_newer(latest: str, current: str) -> bool:
     """Return True if *latest* is strictly newer than *current* (semver).
@@ -78,10 +86,8 @@ def _is_newer(latest: str, current: str) -> bool:
     are treated as older than the same version without a suffix.
     Malformed input returns False (safe default).
     """
-    import re
-    _semver_re = re.compile(r"^(\d+)\.(\d+)\.(\d+)(?:-(.+))?$")
-    m_latest = _semver_re.match(latest.strip())
-    m_current = _semver_re.match(current.strip())
+    m_latest = _SEMVER_RE.match(latest.strip())
+    m_current = _SEMVER_RE.match(current.strip())
     if not m_latest or not m_current:
         return False
     l_tuple = tuple(int(m_latest.group(i)) for i in (1, 2, 3))
@@ -159,12 +165,14 @@ def _get_run_mode() -> str:
     return "executable" if getattr(sys, "frozen", False) else "source"
 
 
+_MISSING_SECTION_RE = re.compile(r'\{\{MISSING::([^:}]+)::')
+
+
 def _extract_missing_sections(questions_content: str | None) -> list[str]:
     """Extract section names from MISSING placeholders in questions content."""
-    import re
     if not questions_content or questions_content.strip() == "NO_MISSING":
         return []
-    return re.findall(r'\{\{MISSING::([^:}]+)::', questions_content)
+    return _MISSING_SECTION_RE.findall(questions_content)
 
 # Default .env content (created automatically on first run)
 # These provide sensible defaults; users still need to fill in their Azure-specific values
@@ -316,12 +324,19 @@ def _is_valid_thread_id(thread_id: str) -> bool:
 
 def get_project_client() -> "AIProjectClient":
     """Create and return an AIProjectClient."""
-    from azure.identity import DefaultAzureCredential
     from azure.ai.projects import AIProjectClient
     endpoint = os.getenv("PROJECT_ENDPOINT")
     if not endpoint:
         raise ValueError("PROJECT_ENDPOINT environment variable is required")
-    return AIProjectClient(endpoint=endpoint, credential=DefaultAzureCredential())
+    return AIProjectClient(endpoint=endpoint, credential=get_credential())
+
+
+# /api/status, /api/validate and /api/about all poll the agent file; parse it
+# once per (mtime, size) instead of on every request.
+@lru_cache(maxsize=4)
+def _read_agent_ids(path: Path, mtime_ns: int, size: int) -> dict:
+    """Parse .agent_ids.json (cache key includes stat info so edits invalidate it)."""
+    return json.loads(path.read_text(encoding="utf-8"))
 
 
 def get_agent_ids() -> dict:
@@ -332,10 +347,12 @@ def get_agent_ids() -> dict:
     Raises ValueError if agents not configured.
     """
     agent_ids_file = _get_agent_ids_file()
-    if not agent_ids_file.exists():
-        raise ValueError("No agents configured. Use Setup to create agents.")
+    try:
+        stat = agent_ids_file.stat()
+    except FileNotFoundError:
+        raise ValueError("No agents configured. Use Setup to create agents.") from None
     
-    data = json.loads(agent_ids_file.read_text(encoding="utf-8"))
+    data = dict(_read_agent_ids(agent_ids_file, stat.st_mtime_ns, stat.st_size))
     
     required = ["researcher", "writer", "reviewer"]
     missing = [k for k in required if not data.get(k)]
@@ -368,19 +385,40 @@ def save_agent_ids(researcher: dict, writer: dict, reviewer: dict, name_prefix:
         "name_prefix": name_prefix,
         "app_version": APP_VERSION,
     }
-    _get_agent_ids_file().write_text(json.dumps(data, indent=2), encoding="utf-8")
+    # Write a unique sibling temp file and swap it in, so a concurrent /api/status never
+    # reads half a file and two concurrent saves never share a temp path
+    path = _get_agent_ids_file()
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=path.name + ".", suffix=".tmp",
+        delete=False, encoding="utf-8",
+    ) as tmp:
+        tmp_path = tmp.name
+        try:
+            tmp.write(json.dumps(data, indent=2))
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp_path)
+            raise
+    try:
+        # NamedTemporaryFile creates the file 0600; keep the mode the saved file already had
+        try:
+            mode = stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+    # Don't rely on mtime resolution to notice a same-size rewrite
+    _read_agent_ids.cache_clear()
 
 
 def extract_blocks(content: str) -> tuple[str, str]:
     """Extract TSG and questions blocks from agent response."""
-    def between(s: str, start: str, end: str) -> str:
-        i = s.find(start)
-        j = s.find(end)
-        if i == -1 or j == -1 or j <= i:
-            return ""
-        return s[i + len(start) : j].strip()
-
-    return between(content, TSG_BEGIN, TSG_END), between(content, QUESTIONS_BEGIN, QUESTIONS_END)
+    tsg_block = find_block(content, TSG_BEGIN, TSG_END)
+    questions_block = find_block(content, QUESTIONS_BEGIN, QUESTIONS_END)
+    return (tsg_block or "").strip(), (questions_block or "").strip()
 
 
 @app.route("/")
@@ -461,11 +499,20 @@ def api_status():
     return jsonify(result)
 
 
+# Interpreter version is fixed for the life of the process
+_PYTHON_VERSION = sys.version.split()[0]
+
+
+@lru_cache(maxsize=1)
+def _get_azure_sdk_version() -> str:
+    """Return the installed azure-ai-projects version (imported lazily, once)."""
+    import azure.ai.projects
+    return azure.ai.projects.__version__
+
+
 @app.route("/api/about")
 def api_about():
     """Return application information for the About dialog."""
-    import azure.ai.projects
-    
     # Get agent info
     agent_info = {}
     try:
@@ -485,8 +532,8 @@ def api_about():
     return jsonify({
         "app_name": "TSG Builder",
         "version": APP_VERSION,
-        "python_version": sys.version.split()[0],
-        "azure_sdk_version": azure.ai.projects.__version__,
+        "python_version": _PYTHON_VERSION,
+        "azure_sdk_version": _get_azure_sdk_version(),
         "endpoint": os.getenv("PROJECT_ENDPOINT", ""),
         "model": os.getenv("MODEL_DEPLOYMENT_NAME", ""),
         "agents": agent_info,
@@ -497,6 +544,53 @@ def api_about():
     })
 
 
+def _check_model_deployment(project: "AIProjectClient", deployment_name: str) -> dict:
+    """Build the Model Deployment check for /api/validate.
+    
+    Uses shared classify_model() from error_utils for consistent tier logic.
+    """
+    try:
+        deployment = project.deployments.get(name=deployment_name)
+        underlying_model = getattr(deployment, "model_name", None) or ""
+
+        classification = classify_model(underlying_model, deployment.name)
+
+        # SUPPORTED and WARN both pass; only BLOCKED fails
+        return {
+            "name": "Model Deployment",
+            "passed": classification.tier != ModelTier.BLOCKED,
+            "message": classification.message,
+            "critical": classification.critical,
+            "warning": classification.tier == ModelTier.WARN,
+        }
+    except Exception as e:
+        error_str = str(e)
+        # Try to list available deployments, filtered to compatible models only
+        compatible_names = []
+        try:
+            for dep in project.deployments.list():
+                dep_model = getattr(dep, "model_name", None) or ""
+                dep_class = classify_model(dep_model, dep.name)
+                if dep_class.tier != ModelTier.BLOCKED:
+                    compatible_names.append(dep.name)
+        except Exception:
+            pass
+        
+        if compatible_names:
+            message = f"Deployment '{deployment_name}' not found. Compatible deployments: {', '.join(compatible_names[:5])}"
+        elif "404" in error_str or "NotFound" in error_str:
+            message = f"Deployment '{deployment_name}' not found in project"
+        else:
+            message = f"Could not verify deployment: {str(e)[:80]}"
+        return {
+            "name": "Model Deployment",
+            "passed": False,
+            "message": message,
+            "critical": False,  # Warning, not blocking
+            "warning": False,
+        }
+
+
 @app.route("/api/validate")
 def api_validate():
     """Run validation checks and return structured results."""
@@ -541,8 +635,7 @@ def api_validate():
     # 3. Check Azure authentication (only if env vars are set)
     if env_ok:
         try:
-            from azure.identity import DefaultAzureCredential
-            credential = DefaultAzureCredential()
+            credential = get_credential()
             token = credential.get_token("https://cognitiveservices.azure.com/.default")
             checks.append({
                 "name": "Azure Authentication",
@@ -564,13 +657,11 @@ def api_validate():
     if env_ok:
         endpoint = os.getenv("PROJECT_ENDPOINT")
         try:
-            from azure.identity import DefaultAzureCredential
             from azure.ai.projects import AIProjectClient
-            project_client = AIProjectClient(endpoint=endpoint, credential=DefaultAzureCredential())
-            with project_client:
-                # Actually make an API call to verify the token works for this resource
-                # This catches tenant mismatches that the auth check alone doesn't catch
-                _ = list(project_client.agents.list(limit=1))
+            project_client = AIProjectClient(endpoint=endpoint, credential=get_credential())
+            # Actually make an API call to verify the token works for this resource
+            # This catches tenant mismatches that the auth check alone doesn't catch
+            _ = list(project_client.agents.list(limit=1))
             checks.append({
                 "name": "Project Connection",
                 "passed": True,
@@ -590,59 +681,17 @@ def api_validate():
                 "message": message,
                 "critical": True,
             })
+            if project_client is not None:
+                project_client.close()
             project_client = None  # Can't proceed with deployment/connection checks
     
     # 5. Check model deployment exists and validate model compatibility
-    # Uses shared classify_model() from error_utils for consistent tier logic.
+    # Reuses the step-4 client (and its authenticated pipeline); closed here.
     deployment_name = os.getenv("MODEL_DEPLOYMENT_NAME", "")
-    if project_client and deployment_name:
-        try:
-            # Re-open project client for deployment check
-            from azure.identity import DefaultAzureCredential
-            from azure.ai.projects import AIProjectClient
-            with AIProjectClient(endpoint=os.getenv("PROJECT_ENDPOINT"), credential=DefaultAzureCredential()) as project:
-                deployment = project.deployments.get(name=deployment_name)
-                underlying_model = getattr(deployment, "model_name", None) or ""
-
-                classification = classify_model(underlying_model, deployment.name)
-
-                # SUPPORTED and WARN both pass; only BLOCKED fails
-                checks.append({
-                    "name": "Model Deployment",
-                    "passed": classification.tier != ModelTier.BLOCKED,
-                    "message": classification.message,
-                    "critical": classification.critical,
-                    "warning": classification.tier == ModelTier.WARN,
-                })
-        except Exception as e:
-            error_str = str(e)
-            # Try to list available deployments, filtered to compatible models only
-            compatible_names = []
-            try:
-                from azure.identity import DefaultAzureCredential
-                from azure.ai.projects import AIProjectClient
-                with AIProjectClient(endpoint=os.getenv("PROJECT_ENDPOINT"), credential=DefaultAzureCredential()) as project:
-                    for dep in project.deployments.list():
-                        dep_model = getattr(dep, "model_name", None) or ""
-                        dep_class = classify_model(dep_model, dep.name)
-                        if dep_class.tier != ModelTier.BLOCKED:
-                            compatible_names.append(dep.name)
-            except Exception:
-                pass
-            
-            if compatible_names:
-                message = f"Deployment '{deployment_name}' not found. Compatible deployments: {', '.join(compatible_names[:5])}"
-            elif "404" in error_str or "NotFound" in error_str:
-                message = f"Deployment '{deployment_name}' not found in project"
-            else:
-                message = f"Could not verify deployment: {str(e)[:80]}"
-            checks.append({
-                "name": "Model Deployment",
-                "passed": False,
-                "message": message,
-                "critical": False,  # Warning, not blocking
-                "warning": False,
-            })
+    if project_client:
+        with project_client:
+            if deployment_name:
+                checks.append(_check_model_deployment(project_client, deployment_name))
     
     # 6. Check agent IDs (not critical) + staleness detection
     agents_stale = False
@@ -736,11 +785,8 @@ def api_create_agent():
     model = os.getenv("MODEL_DEPLOYMENT_NAME")
     agent_name = os.getenv("AGENT_NAME", "TSG-Builder")
     
-    missing = []
-    if not endpoint:
-        missing.append("PROJECT_ENDPOINT")
-    if not model:
-        missing.append("MODEL_DEPLOYMENT_NAME")
+    required = {"PROJECT_ENDPOINT": endpoint, "MODEL_DEPLOYMENT_NAME": model}
+    missing = [name for name, value in required.items() if not value]
     
     if missing:
         return jsonify({
@@ -753,26 +799,9 @@ def api_create_agent():
         print("⚠️  BING_CONNECTION_NAME is set but no longer used. Web search is now managed automatically via WebSearchPreviewTool.")
     
     try:
-        from azure.identity import DefaultAzureCredential
         from azure.ai.projects import AIProjectClient
         from azure.ai.projects.models import PromptAgentDefinition, MCPTool, WebSearchPreviewTool
-        project = AIProjectClient(endpoint=endpoint, credential=DefaultAzureCredential())
-        
-        # Gate: verify the deployment's underlying model is compatible before
-        # creating agents. This prevents agents from being created on
-        # unsupported models (e.g. -chat variants, gpt-4o).
-        with project:
-            deployment = project.deployments.get(name=model)
-            underlying_model = getattr(deployment, "model_name", None) or ""
-            classification = classify_model(underlying_model, deployment.name)
-            if classification.tier == ModelTier.BLOCKED:
-                return jsonify({
-                    "success": False,
-                    "error": classification.message,
-                }), 400
-        
-        # Re-create client (prior context manager closed it)
-        project = AIProjectClient(endpoint=endpoint, credential=DefaultAzureCredential())
+        project = AIProjectClient(endpoint=endpoint, credential=get_credential())
         
         # Build tools for research agent (Web Search + MCP) - v2 patterns
         # WebSearchPreviewTool uses Microsoft-managed Bing — no connection ID required
@@ -790,7 +819,21 @@ def api_create_agent():
         
         created_agents = {}
         
+        # One client (and credential) for the gate check and agent creation,
+        # so setup pays for token acquisition and the TLS handshake only once
         with project:
+            # Gate: verify the deployment's underlying model is compatible before
+            # creating agents. This prevents agents from being created on
+            # unsupported models (e.g. -chat variants, gpt-4o).
+            deployment = project.deployments.get(name=model)
+            underlying_model = getattr(deployment, "model_name", None) or ""
+            classification = classify_model(underlying_model, deployment.name)
+            if classification.tier == ModelTier.BLOCKED:
+                return jsonify({
+                    "success": False,
+                    "error": classification.message,
+                }), 400
+            
             # Create Researcher agent (with tools) - v2 pattern
             researcher = project.agents.create_version(
                 agent_name=f"{agent_name}-Researcher",